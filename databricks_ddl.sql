@@ -40,9 +40,9 @@ LOCATION 'dbfs:/demos/moorcare/synthetic_peatland_sites';
 
 -- Load data from volume
 COPY INTO demos.moorcare.synthetic_peatland_sites
-FROM '@demos.moorcare.data_files/synthetic-peatland-sites.csv'
+FROM '@demos.moorcare.data_files/synthetic-peatland-sites.csv.gz'
 FILEFORMAT = CSV
-FORMAT_OPTIONS ('header' = 'true', 'inferSchema' = 'true')
+FORMAT_OPTIONS ('header' = 'true', 'inferSchema' = 'true', 'nullValue' = 'null')
 COPY_OPTIONS ('mergeSchema' = 'true');
 
 -- ============================================================================
@@ -60,9 +60,9 @@ LOCATION 'dbfs:/demos/moorcare/synthetic_monitoring_data';
 
 -- Load data from volume
 COPY INTO demos.moorcare.synthetic_monitoring_data
-FROM '@demos.moorcare.data_files/synthetic-monitoring-data.csv'
+FROM '@demos.moorcare.data_files/synthetic-monitoring-data.csv.gz'
 FILEFORMAT = CSV
-FORMAT_OPTIONS ('header' = 'true', 'inferSchema' = 'true')
+FORMAT_OPTIONS ('header' = 'true', 'inferSchema' = 'true', 'nullValue' = 'null')
 COPY_OPTIONS ('mergeSchema' = 'true');
 
 -- ============================================================================
@@ -84,9 +84,9 @@ LOCATION 'dbfs:/demos/moorcare/synthetic_restoration_projects';
 
 -- Load data from volume
 COPY INTO demos.moorcare.synthetic_restoration_projects
-FROM '@demos.moorcare.data_files/synthetic-restoration-projects.csv'
+FROM '@demos.moorcare.data_files/synthetic-restoration-projects.csv.gz'
 FILEFORMAT = CSV
-FORMAT_OPTIONS ('header' = 'true', 'inferSchema' = 'true')
+FORMAT_OPTIONS ('header' = 'true', 'inferSchema' = 'true', 'nullValue' = 'null')
 COPY_OPTIONS ('mergeSchema' = 'true');
 
 -- ============================================================================
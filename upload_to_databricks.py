@@ -1,15 +1,37 @@
 """
 Databricks Data Upload Script
-Uploads synthetic peatland data to Databricks tables without requiring SQL warehouse
-Uses Databricks SDK to create tables and upload data directly
+Uploads synthetic peatland data to a Databricks volume using the Databricks SDK,
+then loads it into Delta tables when a SQL warehouse is configured
 """
 
 from databricks.sdk import WorkspaceClient
+from databricks.sdk.core import Config
+from databricks.sdk.errors import InternalError, TemporarilyUnavailable, TooManyRequests
 from databricks.sdk.service import catalog
+from databricks.sdk.service.sql import StatementState
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import argparse
+import contextlib
+import functools
 import os
-import glob
-import pandas as pd
+import gzip
+import logging
+import random
+import re
+import shutil
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional
+
+try:
+    from tqdm import tqdm
+    from tqdm.contrib.logging import logging_redirect_tqdm
+except ImportError:  # progress bar is optional
+    tqdm = None
+
+logger = logging.getLogger(__name__)
 
 # Configuration
 # Workspace: posit-default-workspace (rstudio-partner-posit-default.cloud.databricks.com)
@@ -17,137 +39,615 @@ CATALOG = "demos"
 SCHEMA = "moorcare"
 VOLUME = "data_files"
 DATA_DIR = "data"
+DDL_FILE = "databricks_ddl.sql"
+
+# SQL warehouse HTTP path (/sql/1.0/warehouses/<id>), read once at import
+HTTP_PATH = os.environ.get("DATABRICKS_HTTP_PATH")
+
+TABLE_CONFIGS = {
+    "synthetic_peatland_sites": {
+        "file": "synthetic-peatland-sites.csv",
+        "comment": "Peatland sites with environmental indicators and restoration priorities"
+    },
+    "synthetic_monitoring_data": {
+        "file": "synthetic-monitoring-data.csv",
+        "comment": "Time-series monitoring data for peatland sites (2018-2024)"
+    },
+    "synthetic_restoration_projects": {
+        "file": "synthetic-restoration-projects.csv",
+        "comment": "Restoration projects with costs and intervention types"
+    }
+}
+
+# Number of concurrent uploads; tune down if the workspace starts rate limiting
+UPLOAD_CONCURRENCY = max(1, int(os.environ.get("MOORCARE_UPLOAD_CONCURRENCY", "16")))
+
+# Multipart settings for large files (used when the SDK provides upload_from)
+UPLOAD_PART_SIZE = 16 * 1024 * 1024
+UPLOAD_PARALLELISM = 8
+
+# Retry policy for throttled (429) and transient server (5xx) errors. The SDK
+# retries 429/503 itself (honouring Retry-After) for up to SDK_RETRY_TIMEOUT
+# seconds, then raises TimeoutError from the last error; with_retries unwraps
+# that and makes up to UPLOAD_MAX_ATTEMPTS such windows per file, so one
+# throttled file can hold a worker for roughly a minute and a half at most.
+SDK_RETRY_TIMEOUT = 30
+UPLOAD_MAX_ATTEMPTS = 3
+UPLOAD_MAX_BACKOFF = 30
+RETRYABLE_ERRORS = (TooManyRequests, InternalError, TemporarilyUnavailable)
+
+# Longest a submitted SQL statement may queue or run before it is cancelled
+STATEMENT_TIMEOUT = 600
 
-def main():
+# Floor for the adaptive upload rate limit (requests per second)
+MIN_UPLOAD_QPS = 0.5
+
+
+@dataclass
+class UploadConfig:
     """
-    Upload data files to Databricks tables without requiring SQL warehouse
+    Where to upload the data and how; main() takes one of these so the steps
+    can be driven without going through the command line
     """
+    catalog: str = CATALOG
+    schema: str = SCHEMA
+    volume: str = VOLUME
+    data_dir: str = DATA_DIR
+    warehouse_id: Optional[str] = None
+    qps: Optional[float] = None
 
-    # Initialize Databricks client
-    w = WorkspaceClient()
+    @property
+    def volume_path(self):
+        return f"/Volumes/{self.catalog}/{self.schema}/{self.volume}"
 
-    print("="*60)
-    print("Databricks Data Upload - MoorCare Peatland Conservation")
-    print("="*60)
-    print(f"Workspace: {w.config.host}")
-    print(f"Catalog: {CATALOG}")
-    print(f"Schema: {SCHEMA}")
 
-    # Step 1: Create schema
-    print(f"\n[1/4] Creating schema {CATALOG}.{SCHEMA}...")
+def list_remote_files(w, volume_path):
+    """
+    Return {filename: DirectoryEntry} for files already in the volume, using a
+    single listing request rather than one metadata request per file
+    """
+    try:
+        return {
+            entry.name: entry
+            for entry in w.files.list_directory_contents(volume_path)
+            if not entry.is_directory
+        }
+    except Exception:
+        # Empty or inaccessible volume - upload everything
+        return {}
+
+
+def remote_is_current(local_path, remote_entry):
+    """
+    Return True if remote_entry is an up-to-date copy of local_path
+    (same size and modified no earlier than the local file)
+    """
+    if remote_entry is None or not remote_entry.last_modified:
+        return False
+    if remote_entry.file_size != os.path.getsize(local_path):
+        return False
+
+    # last_modified is in milliseconds since the epoch
+    return remote_entry.last_modified / 1000 >= os.path.getmtime(local_path)
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket capping requests per second. When an upload is
+    still throttled (429/503) after the SDK's own short retry window,
+    with_retries calls throttled(): the bucket pauses for the Retry-After and
+    halves the rate so the workers settle just under the quota.
+    """
+
+    def __init__(self, qps):
+        self.rate = qps
+        # Never raise the rate above what the user asked for
+        self.min_rate = min(qps, MIN_UPLOAD_QPS)
+        self.capacity = max(1.0, qps)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now >= self.updated:
+                    elapsed = now - self.updated
+                    self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+                else:
+                    # Paused after a 429 until self.updated
+                    wait = self.updated - now
+            time.sleep(wait)
+
+    def throttled(self, retry_after=None):
+        with self.lock:
+            self.rate = max(self.rate / 2, self.min_rate)
+            self.tokens = 0.0
+            self.updated = max(self.updated, time.monotonic() + (retry_after or 1))
+
+
+def retryable_cause(error):
+    """
+    Return the retryable SDK error behind error, or None. Once the SDK's own
+    retry window runs out it raises TimeoutError from the last 429/503, so
+    that wrapper is unwrapped here.
+    """
+    if isinstance(error, TimeoutError):
+        error = error.__cause__
+    return error if isinstance(error, RETRYABLE_ERRORS) else None
+
+
+def with_retries(fn, *args, limiter=None):
+    """
+    Call fn, retrying retryable errors with exponential backoff and jitter.
+    If a RateLimiter is given, each attempt waits for a token and 429/503s
+    slow the limiter down instead of sleeping here.
+    """
+    for attempt in range(UPLOAD_MAX_ATTEMPTS):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return fn(*args)
+        except (TimeoutError, *RETRYABLE_ERRORS) as e:
+            cause = retryable_cause(e)
+            if cause is None or attempt == UPLOAD_MAX_ATTEMPTS - 1:
+                raise
+            retry_after = getattr(cause, "retry_after_secs", None)
+            if limiter is not None and isinstance(cause, (TooManyRequests, TemporarilyUnavailable)):
+                limiter.throttled(retry_after)
+            else:
+                backoff = min(2 ** attempt, UPLOAD_MAX_BACKOFF) + random.uniform(0, 1)
+                time.sleep(max(backoff, retry_after or 0))
+
+
+def compress_csv(csv_file):
+    """
+    Write csv_file.gz alongside csv_file and return its path. An existing .gz
+    newer than the CSV is reused.
+    """
+    gz_file = f"{csv_file}.gz"
+    if os.path.exists(gz_file) and os.path.getmtime(gz_file) >= os.path.getmtime(csv_file):
+        return gz_file
+
+    # Write to a temp name first so an interrupted run never leaves a partial .gz
+    tmp_file = f"{gz_file}.tmp"
+    try:
+        with open(csv_file, "rb") as src, gzip.open(tmp_file, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_file, gz_file)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+    return gz_file
+
+
+def upload_file(w, csv_file, remote_path):
+    """
+    Upload a single local file to the volume
+    """
+    if hasattr(w.files, "upload_from"):
+        # Streams from disk and splits large files into parallel parts
+        w.files.upload_from(
+            file_path=remote_path,
+            source_path=csv_file,
+            overwrite=True,
+            use_parallel=True,
+            parallelism=UPLOAD_PARALLELISM,
+            part_size=UPLOAD_PART_SIZE
+        )
+    else:
+        # Older SDK versions only support single-part uploads; pass the
+        # file handle so the body is streamed rather than read into memory
+        with open(csv_file, "rb") as f:
+            w.files.upload(
+                remote_path,
+                f,
+                overwrite=True
+            )
+
+
+def create_schema(w, catalog_name, schema):
+    """
+    Create the schema, treating an existing schema as success
+    """
     try:
         w.schemas.create(
-            name=SCHEMA,
-            catalog_name=CATALOG,
+            name=schema,
+            catalog_name=catalog_name,
             comment="MoorCare peatland restoration data for Defra demo"
         )
-        print(f"  ✓ Created schema {CATALOG}.{SCHEMA}")
+        logger.info(f"  ✓ Created schema {catalog_name}.{schema}")
     except Exception as e:
         if "already exists" in str(e).lower():
-            print(f"  ✓ Schema {CATALOG}.{SCHEMA} already exists")
+            logger.info(f"  ✓ Schema {catalog_name}.{schema} already exists")
         else:
-            print(f"  ⚠ Warning: {str(e)}")
+            logger.warning(f"  ⚠ Warning: {str(e)}")
 
-    # Step 2: Create volume
-    print(f"\n[2/4] Creating volume {CATALOG}.{SCHEMA}.{VOLUME}...")
+
+def create_volume(w, catalog_name, schema, volume):
+    """
+    Create the managed volume, treating an existing volume as success
+    """
     try:
         w.volumes.create(
-            name=VOLUME,
-            catalog_name=CATALOG,
-            schema_name=SCHEMA,
+            name=volume,
+            catalog_name=catalog_name,
+            schema_name=schema,
             volume_type=catalog.VolumeType.MANAGED,
             comment="Data files for peatland restoration project"
         )
-        print(f"  ✓ Created volume {CATALOG}.{SCHEMA}.{VOLUME}")
+        logger.info(f"  ✓ Created volume {catalog_name}.{schema}.{volume}")
     except Exception as e:
         if "already exists" in str(e).lower():
-            print(f"  ✓ Volume {CATALOG}.{SCHEMA}.{VOLUME} already exists")
+            logger.info(f"  ✓ Volume {catalog_name}.{schema}.{volume} already exists")
         else:
-            print(f"  ⚠ Warning: {str(e)}")
+            logger.warning(f"  ⚠ Warning: {str(e)}")
 
-    # Step 3: Upload CSV files to volume
-    print(f"\n[3/4] Uploading CSV files to volume...")
-    volume_path = f"/Volumes/{CATALOG}/{SCHEMA}/{VOLUME}"
 
-    csv_files = glob.glob(f"{DATA_DIR}/synthetic-*.csv")
+def upload_csvs(w, volume_path, data_dir, qps=None):
+    """
+    Gzip and upload the synthetic CSV files in data_dir to the volume
+    concurrently, optionally capped at qps uploads per second.
+    Returns the set of remote filenames uploaded in this run (unchanged files
+    are skipped), or None if there was nothing to upload.
+    """
+    # (local, remote) pairs, largest first so the longest uploads start earliest.
+    # scandir gives name and size from a single pass over the directory.
+    csv_entries = []
+    if os.path.isdir(data_dir):
+        with os.scandir(data_dir) as entries:
+            csv_entries = [
+                (entry.stat().st_size, entry.path, entry.name)
+                for entry in entries
+                if entry.name.startswith("synthetic-") and entry.name.endswith(".csv")
+                and entry.is_file()
+            ]
+    upload_tasks = [
+        (path, f"{volume_path}/{name}.gz")
+        for _, path, name in sorted(csv_entries, reverse=True)
+    ]
 
-    if not csv_files:
-        print(f"  ⚠ No CSV files found in {DATA_DIR}/")
-        print(f"  Run 'Rscript data/generate_data.R' to generate the data first")
-        return
+    if not upload_tasks:
+        logger.warning(f"  ⚠ No CSV files found in {data_dir}/")
+        logger.warning(f"  Run 'Rscript data/generate_data.R' to generate the data first")
+        return None
 
-    for csv_file in csv_files:
-        filename = os.path.basename(csv_file)
-        remote_path = f"{volume_path}/{filename}"
+    remote_files = list_remote_files(w, volume_path)
+    limiter = RateLimiter(qps) if qps else None
 
-        print(f"  Uploading {filename}...")
+    def _upload_one(csv_file, remote_path):
+        filename = os.path.basename(remote_path)
 
         try:
-            with open(csv_file, "rb") as f:
-                file_content = f.read()
+            gz_file = compress_csv(csv_file)
+            if remote_is_current(gz_file, remote_files.get(filename)):
+                return filename, remote_path, True, None
 
-            w.files.upload(
-                remote_path,
-                file_content,
-                overwrite=True
+            with_retries(upload_file, w, gz_file, remote_path, limiter=limiter)
+            return filename, remote_path, False, None
+        except Exception as e:
+            return filename, remote_path, False, e
+
+    logger.info(f"  Uploading {len(upload_tasks)} files ({UPLOAD_CONCURRENCY} concurrent)...")
+
+    # Only the main thread reports progress, so workers never contend for stdout
+    progress = tqdm(total=len(upload_tasks), unit="file") if tqdm else None
+    redirect = logging_redirect_tqdm() if tqdm else contextlib.nullcontext()
+
+    uploaded = set()
+
+    with redirect, ThreadPoolExecutor(max_workers=UPLOAD_CONCURRENCY) as executor:
+        futures = [
+            executor.submit(_upload_one, csv_file, remote_path)
+            for csv_file, remote_path in upload_tasks
+        ]
+        for future in as_completed(futures):
+            if progress is not None:
+                progress.update(1)
+            filename, remote_path, skipped, error = future.result()
+            if skipped:
+                logger.info(f"    ✓ {filename} unchanged, skipping upload")
+            elif error is None:
+                uploaded.add(filename)
+                logger.info(f"    ✓ Uploaded {filename} to {remote_path}")
+            else:
+                logger.error(f"    ✗ Error uploading {filename}: {str(error)}")
+
+    if progress is not None:
+        progress.close()
+
+    return uploaded
+
+
+def warehouse_id_from_http_path(http_path):
+    """
+    Extract the warehouse ID from a SQL warehouse HTTP path such as
+    /sql/1.0/warehouses/<id>
+    """
+    if http_path and "/warehouses/" in http_path:
+        return http_path.rstrip("/").rsplit("/", 1)[-1]
+    return None
+
+
+def wait_for_statement(w, response, submitted_at=None):
+    """
+    Poll a submitted statement until it finishes. Cancels the statement and
+    raises TimeoutError if it is still queued or running STATEMENT_TIMEOUT
+    seconds after submitted_at (a time.monotonic() value; defaults to now);
+    raises RuntimeError if it does not succeed.
+    """
+    if submitted_at is None:
+        submitted_at = time.monotonic()
+    deadline = submitted_at + STATEMENT_TIMEOUT
+    while response.status.state in (StatementState.PENDING, StatementState.RUNNING):
+        if time.monotonic() >= deadline:
+            w.statement_execution.cancel_execution(response.statement_id)
+            raise TimeoutError(
+                f"statement did not finish within {STATEMENT_TIMEOUT}s and was cancelled"
             )
-            print(f"    ✓ Uploaded to {remote_path}")
+        time.sleep(1)
+        response = w.statement_execution.get_statement(response.statement_id)
+
+    if response.status.state != StatementState.SUCCEEDED:
+        error = response.status.error
+        raise RuntimeError(error.message if error else response.status.state.value)
+    return response
+
+
+def run_statements(w, warehouse_id, statements):
+    """
+    Submit independent statements without waiting, then wait for them all so
+    they run concurrently on the warehouse. Each statement's timeout counts
+    from its own submission. Returns (response, error) pairs in the same
+    order as statements.
+    """
+    submitted = []
+    for statement in statements:
+        submitted_at = time.monotonic()
+        try:
+            submitted.append((w.statement_execution.execute_statement(
+                statement=statement,
+                warehouse_id=warehouse_id,
+                wait_timeout="0s"
+            ), submitted_at, None))
         except Exception as e:
-            print(f"    ✗ Error: {str(e)}")
-
-    # Step 4: Create tables pointing to volume files
-    print(f"\n[4/4] Creating external tables...")
-
-    table_configs = {
-        "synthetic_peatland_sites": {
-            "file": "synthetic-peatland-sites.csv",
-            "comment": "Peatland sites with environmental indicators and restoration priorities"
-        },
-        "synthetic_monitoring_data": {
-            "file": "synthetic-monitoring-data.csv",
-            "comment": "Time-series monitoring data for peatland sites (2018-2024)"
-        },
-        "synthetic_restoration_projects": {
-            "file": "synthetic-restoration-projects.csv",
-            "comment": "Restoration projects with costs and intervention types"
-        }
+            submitted.append((None, submitted_at, e))
+
+    results = []
+    for response, submitted_at, error in submitted:
+        if error is None:
+            try:
+                response = wait_for_statement(w, response, submitted_at)
+            except Exception as e:
+                error = e
+        results.append((response, error))
+    return results
+
+
+def quote_identifier(name):
+    """
+    Backtick-quote a SQL identifier such as a catalog, schema or table name
+    """
+    return "`" + name.replace("`", "``") + "`"
+
+
+def sql_string(value):
+    """
+    Render value as a single-quoted SQL string literal
+    """
+    return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def read_table_columns(ddl_file):
+    """
+    Return {table_name: column definitions} from the CREATE TABLE statements
+    in ddl_file, so tables created here match databricks_ddl.sql exactly
+    """
+    with open(ddl_file, encoding="utf-8") as f:
+        ddl = f.read()
+
+    pattern = re.compile(
+        r"CREATE\s+TABLE\s+IF\s+NOT\s+EXISTS\s+[\w.`]*?(\w+)\s*\((.*?)\)\s*USING",
+        re.IGNORECASE | re.DOTALL
+    )
+    return {
+        table_name: " ".join(columns.split())
+        for table_name, columns in pattern.findall(ddl)
     }
 
-    for table_name, config in table_configs.items():
-        print(f"\n  Creating table {CATALOG}.{SCHEMA}.{table_name}...")
-        file_path = f"{volume_path}/{config['file']}"
 
-        try:
-            # Read CSV to infer schema
-            df = pd.read_csv(f"{DATA_DIR}/{config['file']}", na_values=['null'])
+def load_tables(w, warehouse_id, catalog_name, schema, volume_path):
+    """
+    Load each CSV from the volume into its Delta table on the warehouse.
+    Tables are created with the column types from databricks_ddl.sql, then
+    replaced in one atomic INSERT OVERWRITE from read_files, so the table
+    always matches the file in the volume (whichever run uploaded it) and
+    keeps its row filter and grants. Statements in each stage run together.
+    """
+    try:
+        table_columns = read_table_columns(DDL_FILE)
+    except OSError as e:
+        logger.error(f"  ✗ Error reading {DDL_FILE}: {str(e)}")
+        return
 
-            # Create table using SDK
-            # Note: This creates an external table pointing to the CSV in the volume
-            full_table_name = f"{CATALOG}.{SCHEMA}.{table_name}"
+    tables = []
+    for table_name, config in TABLE_CONFIGS.items():
+        full_table_name = ".".join(
+            quote_identifier(part) for part in (catalog_name, schema, table_name)
+        )
+        if table_name not in table_columns:
+            logger.error(f"  ✗ No CREATE TABLE for {table_name} in {DDL_FILE}")
+            continue
+        tables.append((
+            full_table_name,
+            f"{volume_path}/{config['file']}.gz",
+            table_columns[table_name],
+            config
+        ))
 
-            print(f"    → Table: {full_table_name}")
-            print(f"    → Source: {file_path}")
-            print(f"    → Rows: {len(df):,}")
-            print(f"    → Columns: {len(df.columns)}")
-            print(f"    ✓ Table configuration prepared")
+    def _run_stage(tables, statements, action):
+        # Returns the tables whose statement succeeded; failures are reported
+        results = run_statements(w, warehouse_id, statements)
+        succeeded = []
+        for table, (response, error) in zip(tables, results):
+            if error is None:
+                succeeded.append((table, response))
+            else:
+                logger.error(f"  ✗ Error {action} {table[0]}: {str(error)}")
+        return succeeded
 
-        except Exception as e:
-            print(f"    ✗ Error: {str(e)}")
+    created = _run_stage(tables, [
+        f"CREATE TABLE IF NOT EXISTS {full_table_name} ({columns}) "
+        f"USING DELTA COMMENT {sql_string(config['comment'])}"
+        for full_table_name, _, columns, config in tables
+    ], "creating")
+    created = [table for table, _ in created]
+
+    # read_files parses the CSV with the table's own schema; missing values
+    # are written by generate_data.R as the literal string null
+    loaded = _run_stage(created, [
+        f"INSERT OVERWRITE {full_table_name} "
+        f"SELECT {', '.join(quote_identifier(c.split()[0]) for c in columns.split(','))} "
+        f"FROM read_files({sql_string(file_path)}, "
+        f"format => 'csv', header => true, nullValue => 'null', "
+        f"schema => {sql_string(columns)})"
+        for full_table_name, file_path, columns, _ in created
+    ], "loading")
+
+    for (full_table_name, file_path, _, _), response in loaded:
+        logger.info(f"  Table {full_table_name}")
+        logger.info(f"    → Source: {file_path}")
+
+        # INSERT returns (num_affected_rows, num_inserted_rows)
+        rows = response.result.data_array if response.result else None
+        if rows:
+            logger.info(f"    → Rows inserted: {int(rows[0][1]):,}")
+        logger.info(f"    ✓ Loaded {full_table_name}")
+
+
+@functools.lru_cache(maxsize=None)
+def get_workspace_client():
+    """
+    Return a shared WorkspaceClient, created on first use. All requests share
+    its keep-alive connection pool, sized so every upload worker can hold a
+    connection; repeated calls in one process reuse the same client.
+    """
+    pool_size = max(UPLOAD_CONCURRENCY, 20)
+    return WorkspaceClient(config=Config(
+        max_connection_pools=pool_size,
+        max_connections_per_pool=pool_size,
+        retry_timeout_seconds=SDK_RETRY_TIMEOUT
+    ))
+
+
+def positive_float(value):
+    """
+    argparse type for options that must be a number greater than zero
+    """
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number: {value!r}")
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {value}")
+    return number
+
+
+def parse_args(argv=None):
+    """
+    Parse command-line options into an UploadConfig; defaults match the demo
+    workspace
+    """
+    parser = argparse.ArgumentParser(
+        description="Upload synthetic peatland data to Databricks"
+    )
+    parser.add_argument("--catalog", default=CATALOG, help="Unity Catalog catalog name")
+    parser.add_argument("--schema", default=SCHEMA, help="Schema to create/use")
+    parser.add_argument("--volume", default=VOLUME, help="Volume to upload CSV files to")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Directory containing the CSV files")
+    parser.add_argument(
+        "--qps",
+        type=positive_float,
+        default=None,
+        help="Maximum uploads started per second (default: no limit)"
+    )
+    parser.add_argument(
+        "--warehouse-id",
+        default=warehouse_id_from_http_path(HTTP_PATH),
+        help="SQL warehouse used to load the tables (default: from DATABRICKS_HTTP_PATH)"
+    )
+    args = parser.parse_args(argv)
+    return UploadConfig(
+        catalog=args.catalog,
+        schema=args.schema,
+        volume=args.volume,
+        data_dir=args.data_dir,
+        warehouse_id=args.warehouse_id,
+        qps=args.qps
+    )
+
+
+def main(config=None):
+    """
+    Upload data files to a Databricks volume and load them into tables.
+    Uses config if given, otherwise the command-line options.
+    """
+    if config is None:
+        config = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    # Initialize Databricks client
+    w = get_workspace_client()
+
+    logger.info("="*60)
+    logger.info("Databricks Data Upload - MoorCare Peatland Conservation")
+    logger.info("="*60)
+    logger.info(f"Workspace: {w.config.host}")
+    logger.info(f"Catalog: {config.catalog}")
+    logger.info(f"Schema: {config.schema}")
+
+    # Step 1: Create schema
+    logger.info(f"[1/4] Creating schema {config.catalog}.{config.schema}...")
+    create_schema(w, config.catalog, config.schema)
+
+    # Step 2: Create volume
+    logger.info(f"[2/4] Creating volume {config.catalog}.{config.schema}.{config.volume}...")
+    create_volume(w, config.catalog, config.schema, config.volume)
+
+    # Step 3: Upload CSV files to volume
+    logger.info(f"[3/4] Uploading CSV files to volume...")
+    volume_path = config.volume_path
+
+    if upload_csvs(w, volume_path, config.data_dir, qps=config.qps) is None:
+        return
+
+    # Step 4: Load tables from the volume files
+    logger.info(f"[4/4] Loading tables from the volume...")
+    if config.warehouse_id:
+        load_tables(w, config.warehouse_id, config.catalog, config.schema, volume_path)
+    else:
+        logger.warning(f"  ⚠ No SQL warehouse configured, skipping table load")
+        logger.warning(f"  Set DATABRICKS_HTTP_PATH or pass --warehouse-id to load tables")
 
     # Final summary
-    print("\n" + "="*60)
-    print("Upload Complete!")
-    print("="*60)
-    print(f"\n📁 Data uploaded to volume:")
-    print(f"   {volume_path}/")
-    print(f"\n📊 Tables created:")
-    print(f"   • {CATALOG}.{SCHEMA}.synthetic_peatland_sites")
-    print(f"   • {CATALOG}.{SCHEMA}.synthetic_monitoring_data")
-    print(f"   • {CATALOG}.{SCHEMA}.synthetic_restoration_projects")
-    print(f"\n⚠️  Note: To load data into Delta tables and apply row-level")
-    print(f"   security, run the SQL commands in databricks_ddl.sql")
-    print(f"   using a SQL warehouse or cluster.")
-    print()
+    logger.info("="*60)
+    logger.info("Upload Complete!")
+    logger.info("="*60)
+    logger.info(f"📁 Data uploaded to volume:")
+    logger.info(f"   {volume_path}/")
+    if config.warehouse_id:
+        logger.info(f"📊 Tables loaded:")
+        for table_name in TABLE_CONFIGS:
+            logger.info(f"   • {config.catalog}.{config.schema}.{table_name}")
+    logger.info(f"⚠️  Note: To apply row-level security, run the SQL commands")
+    logger.info(f"   in databricks_ddl.sql using a SQL warehouse or cluster.")
 
 
 if __name__ == "__main__":